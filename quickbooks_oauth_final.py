@@ -1,17 +1,106 @@
 import os
+import sys
 import time
 import json
+import hashlib
+import pathlib
+import tempfile
+import random
+import secrets
+import asyncio
 import logging
+import threading
+import concurrent.futures
 import requests
-import trafilatura
+from urllib.parse import urlencode, urlparse, parse_qs
+from urllib3.util.retry import Retry
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+# Refresh this many seconds before Intuit's reported expiry so a token never
+# goes stale mid-flight between our check and server-side validation
+_TOKEN_SAFETY_SECONDS = 300
+
+# Exponential backoff for connection-level failures; HTTP-level 429/5xx
+# retries are handled by urllib3's Retry mounted on the session adapter
+_RETRY_ATTEMPTS = 3
+_RETRY_BASE_SECONDS = 0.5
+_RETRY_CAP_SECONDS = 8.0
+_RETRY_JITTER_SECONDS = 0.25
+
+_TOKEN_URL = "https://oauth.platform.intuit.com/oauth2/v1/tokens/bearer"
+_API_BASE_URL = "https://quickbooks.api.intuit.com/v3/company"
+
+# Bound every HTTP call so a stalled connection to Intuit can't hang the
+# calling thread indefinitely
+_CONNECT_TIMEOUT = 3.05
+_READ_TIMEOUT = 30
+
+# Refuse to buffer API responses larger than this; callers should stream
+# oversized query results through iter_api_call instead
+_MAX_RESPONSE_BYTES = 50 * 1024 * 1024
+
+_TOKEN_HEADERS = {
+    "Content-Type": "application/x-www-form-urlencoded",
+    "Accept": "application/json"
+}
+
+_API_HEADERS_TEMPLATE = {
+    "Accept": "application/json",
+    "Content-Type": "application/json"
+}
+
+# The scraped playground documentation rarely changes; cache it on disk for
+# a day so repeat invocations skip the network fetch and HTML parse entirely
+_DOCS_CACHE_PATH = pathlib.Path(tempfile.gettempdir()) / "qb_oauth_docs.txt"
+_DOCS_CACHE_TTL_SECONDS = 86400
+
+
+def _json_loads(data):
+    """Decode JSON bytes, using orjson's C parser when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class SecretsFilter(logging.Filter):
+    """
+    Redact an OAuth client's secrets from log records
+
+    Auth codes, tokens, and the client secret are replaced with *** so
+    they never reach log output verbatim. Skipping the formatting of
+    multi-KB JWTs is also cheaper than emitting them.
+    """
+
+    def __init__(self, oauth):
+        super().__init__()
+        self._oauth = oauth
+
+    def filter(self, record):
+        message = record.getMessage()
+        for secret in (self._oauth.access_token, self._oauth.refresh_token,
+                       self._oauth.auth_code, self._oauth.client_secret):
+            if secret:
+                message = message.replace(secret, "***")
+        record.msg = message
+        record.args = ()
+        return True
+
 class QuickBooksOAuth:
     """
     QuickBooks OAuth 2.0 Authorization Class
@@ -41,9 +130,98 @@ class QuickBooksOAuth:
         self.auth_code = None
         self.access_token = None
         self.refresh_token = None
-        self.token_expiry = None
         self.realm_id = None
-    
+        self._api_base = None
+        self._expiry_mono = None
+        self._refresh_lock = threading.Lock()
+
+        # Random per-client state defeats CSRF on the redirect; the full
+        # authorization URL is built once here since nothing in it changes
+        # after construction
+        self._state = secrets.token_urlsafe(16)
+        self._auth_url = "https://appcenter.intuit.com/connect/oauth2?" + urlencode({
+            "client_id": client_id,
+            "redirect_uri": redirect_uri,
+            "response_type": "code",
+            "scope": "com.intuit.quickbooks.accounting",
+            "state": self._state
+        })
+
+        # Reuse one session (and its connection pool) for all token and API
+        # calls so we don't pay a fresh TCP + TLS handshake per request.
+        # QuickBooks throttles per realm with 429s, so retry those and
+        # transient 5xx with backoff, honoring Retry-After when present.
+        self._session = requests.Session()
+        retries = Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "POST"]),
+            respect_retry_after_header=True
+        )
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries)
+        self._session.mount("https://oauth.platform.intuit.com", adapter)
+        self._session.mount("https://quickbooks.api.intuit.com", adapter)
+        self._session.headers.update({"Accept": "application/json"})
+
+        # HTTP/2 client for make_api_calls, created lazily on first use
+        self._hclient = None
+
+        self._secrets_filter = SecretsFilter(self)
+        logger.addFilter(self._secrets_filter)
+
+    def close(self):
+        """Release the underlying HTTP connection pools"""
+        self._session.close()
+        if self._hclient is not None:
+            self._hclient.close()
+        logger.removeFilter(self._secrets_filter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def token_expiry(self):
+        """
+        Wall-clock expiry timestamp, derived lazily from the monotonic
+        deadline. Kept for human-readable display only; expiry decisions
+        compare against the monotonic clock, which can't jump under NTP.
+        """
+        if self._expiry_mono is None:
+            return None
+        return int(time.time() + (self._expiry_mono - time.monotonic()))
+
+    def _request_with_retry(self, method, url, **kwargs):
+        """
+        Issue an HTTP request, retrying connection errors and timeouts
+
+        Sleeps an exponentially growing, jittered delay between attempts so
+        concurrent clients don't retry in lockstep. Status-code retries
+        (429/5xx) are already handled by the session adapter.
+
+        Args:
+            method (str): HTTP method, e.g. "GET" or "POST"
+            url (str): Request URL
+            **kwargs: Passed through to requests.Session.request
+
+        Returns:
+            requests.Response: The final response
+        """
+        kwargs.setdefault("timeout", (_CONNECT_TIMEOUT, _READ_TIMEOUT))
+        for attempt in range(_RETRY_ATTEMPTS):
+            try:
+                return self._session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == _RETRY_ATTEMPTS - 1:
+                    raise
+                delay = min(_RETRY_CAP_SECONDS, _RETRY_BASE_SECONDS * 2 ** attempt)
+                delay += random.uniform(0, _RETRY_JITTER_SECONDS)
+                logger.warning("Request to %s failed, retrying in %.1fs...", url, delay)
+                time.sleep(delay)
+
     def get_authorization_url(self):
         """
         Generate the authorization URL for QuickBooks OAuth
@@ -51,16 +229,7 @@ class QuickBooksOAuth:
         Returns:
             str: Authorization URL to redirect the user to
         """
-        auth_url = (
-            f"https://appcenter.intuit.com/connect/oauth2"
-            f"?client_id={self.client_id}"
-            f"&redirect_uri={self.redirect_uri}"
-            f"&response_type=code"
-            f"&scope=com.intuit.quickbooks.accounting"
-            f"&state=randomstate"
-        )
-        
-        return auth_url
+        return self._auth_url
     
     def set_auth_code_from_redirect(self, redirect_url):
         """
@@ -72,27 +241,63 @@ class QuickBooksOAuth:
         Returns:
             bool: True if successful, False otherwise
         """
-        logger.info(f"Processing redirect URL: {redirect_url}")
-        
-        if "code=" not in redirect_url:
+        # Log without the query string: the code and state parameters are
+        # secrets, and at this point the SecretsFilter has nothing to match
+        logger.info("Processing redirect URL: %s",
+                    urlparse(redirect_url)._replace(query="").geturl())
+
+        # Parse the query string properly so percent-encoded values are
+        # decoded and a "code=" in the path or fragment can't confuse us
+        params = parse_qs(urlparse(redirect_url).query)
+
+        if params.get("state", [None])[0] != self._state:
+            logger.error("State parameter mismatch in redirect URL; possible CSRF")
+            return False
+
+        self.auth_code = params.get("code", [None])[0]
+        self.realm_id = params.get("realmId", [None])[0]
+        self._api_base = f"{_API_BASE_URL}/{self.realm_id}" if self.realm_id else None
+
+        if not self.auth_code:
             logger.error("Authorization code not found in redirect URL")
             return False
-            
-        # Extract the authorization code
-        code_segment = redirect_url.split("code=")[1]
-        self.auth_code = code_segment.split("&")[0] if "&" in code_segment else code_segment
-        
-        # Extract the realm ID if present
-        if "realmId=" in redirect_url:
-            realm_id_segment = redirect_url.split("realmId=")[1]
-            self.realm_id = realm_id_segment.split("&")[0] if "&" in realm_id_segment else realm_id_segment
-            
-        logger.info(f"Successfully extracted authorization code: {self.auth_code}")
+
+        logger.info("Successfully extracted authorization code: %s", self.auth_code)
         if self.realm_id:
-            logger.info(f"Successfully extracted realm ID: {self.realm_id}")
+            logger.info("Successfully extracted realm ID: %s", self.realm_id)
             
         return True
     
+    def _post_token(self, payload):
+        """
+        POST a grant payload to the token endpoint and store the tokens
+
+        Args:
+            payload (dict): Grant-type-specific form fields
+
+        Returns:
+            bool: True if tokens were obtained and stored, False otherwise
+        """
+        response = self._request_with_retry(
+            "POST",
+            _TOKEN_URL,
+            data=payload,
+            headers=_TOKEN_HEADERS,
+            auth=(self.client_id, self.client_secret)
+        )
+
+        if response.status_code == 200:
+            token_data = _json_loads(response.content)
+            self.access_token = token_data.get("access_token")
+            self.refresh_token = token_data.get("refresh_token")
+            expires_in = token_data.get("expires_in", 3600)
+            self._expiry_mono = time.monotonic() + expires_in - _TOKEN_SAFETY_SECONDS
+            return True
+
+        body_digest = hashlib.sha256(response.content).hexdigest()[:12]
+        logger.error("Token request failed. Status: %s, Body sha256: %s", response.status_code, body_digest)
+        return False
+
     def exchange_code_for_tokens(self):
         """
         Exchange authorization code for access and refresh tokens
@@ -105,41 +310,21 @@ class QuickBooksOAuth:
             return False
             
         logger.info("Exchanging authorization code for tokens...")
-        token_url = "https://oauth.platform.intuit.com/oauth2/v1/tokens/bearer"
-        
+
         payload = {
             "grant_type": "authorization_code",
             "code": self.auth_code,
             "redirect_uri": self.redirect_uri
         }
-        
-        headers = {
-            "Content-Type": "application/x-www-form-urlencoded",
-            "Accept": "application/json"
-        }
-        
+
         try:
-            response = requests.post(
-                token_url,
-                data=payload,
-                headers=headers,
-                auth=(self.client_id, self.client_secret)
-            )
-            
-            if response.status_code == 200:
-                token_data = response.json()
-                self.access_token = token_data.get("access_token")
-                self.refresh_token = token_data.get("refresh_token")
-                self.token_expiry = int(time.time()) + token_data.get("expires_in", 3600)
-                
+            if self._post_token(payload):
                 logger.info("Successfully obtained access and refresh tokens")
                 return True
-            else:
-                logger.error(f"Failed to exchange code for tokens. Status: {response.status_code}, Response: {response.text}")
-                return False
-                
+            return False
+
         except Exception as e:
-            logger.error(f"Error during token exchange: {str(e)}")
+            logger.error("Error during token exchange: %s", e)
             return False
     
     def refresh_access_token(self):
@@ -154,43 +339,43 @@ class QuickBooksOAuth:
             return False
             
         logger.info("Refreshing access token...")
-        token_url = "https://oauth.platform.intuit.com/oauth2/v1/tokens/bearer"
-        
+
         payload = {
             "grant_type": "refresh_token",
             "refresh_token": self.refresh_token
         }
-        
-        headers = {
-            "Content-Type": "application/x-www-form-urlencoded",
-            "Accept": "application/json"
-        }
-        
+
         try:
-            response = requests.post(
-                token_url,
-                data=payload,
-                headers=headers,
-                auth=(self.client_id, self.client_secret)
-            )
-            
-            if response.status_code == 200:
-                token_data = response.json()
-                self.access_token = token_data.get("access_token")
-                self.refresh_token = token_data.get("refresh_token")
-                self.token_expiry = int(time.time()) + token_data.get("expires_in", 3600)
-                
+            if self._post_token(payload):
                 logger.info("Successfully refreshed access token")
                 return True
-            else:
-                logger.error(f"Failed to refresh access token. Status: {response.status_code}, Response: {response.text}")
-                return False
-                
+            return False
+
         except Exception as e:
-            logger.error(f"Error during token refresh: {str(e)}")
+            logger.error("Error during token refresh: %s", e)
             return False
     
-    def make_api_call(self, endpoint):
+    def _ensure_fresh_token(self):
+        """
+        Refresh the token if it is near expiry, under the single-flight lock
+
+        The lock makes the refresh single-flight: concurrent callers wait
+        for one refresh instead of each hitting the token endpoint. The
+        monotonic clock is immune to wall-clock jumps under NTP sync.
+
+        Returns:
+            bool: True if the token is usable, False if a refresh failed
+        """
+        if self._expiry_mono is not None and time.monotonic() >= self._expiry_mono:
+            with self._refresh_lock:
+                if self._expiry_mono is not None and time.monotonic() >= self._expiry_mono:
+                    logger.info("Access token expired, refreshing...")
+                    if not self.refresh_access_token():
+                        logger.error("Failed to refresh expired token")
+                        return False
+        return True
+
+    def make_api_call(self, endpoint, _retried=False):
         """
         Make an API call to QuickBooks API
         
@@ -204,70 +389,432 @@ class QuickBooksOAuth:
             logger.error("Access token or Realm ID not available")
             return None
             
-        # Check if token is expired and refresh if needed
-        if self.token_expiry and int(time.time()) >= self.token_expiry:
-            logger.info("Access token expired, refreshing...")
-            if not self.refresh_access_token():
-                logger.error("Failed to refresh expired token")
-                return None
-                
-        logger.info(f"Making API call to {endpoint}")
-        
-        api_url = f"https://quickbooks.api.intuit.com/v3/company/{self.realm_id}/{endpoint}"
-        
-        headers = {
-            "Authorization": f"Bearer {self.access_token}",
-            "Accept": "application/json",
-            "Content-Type": "application/json"
-        }
+        if not self._ensure_fresh_token():
+            return None
+
+        logger.info("Making API call to %s", endpoint)
+
+        if self._api_base is None:
+            # realm_id was assigned directly rather than via the redirect parser
+            self._api_base = f"{_API_BASE_URL}/{self.realm_id}"
+        api_url = f"{self._api_base}/{endpoint}"
+
+        headers = dict(_API_HEADERS_TEMPLATE, Authorization=f"Bearer {self.access_token}")
         
         try:
-            response = requests.get(api_url, headers=headers)
-            
+            response = self._request_with_retry("GET", api_url, headers=headers, stream=True)
+
+            content_length = int(response.headers.get("Content-Length", 0))
+            if content_length > _MAX_RESPONSE_BYTES:
+                response.close()
+                logger.error("API response too large (%s bytes); use iter_api_call to stream it", content_length)
+                return None
+
             if response.status_code == 200:
                 logger.info("API call successful")
-                return response.json()
+                # Decode from the raw bytes directly; on multi-MB query
+                # responses orjson is typically 2-3x faster than response.json()
+                return _json_loads(response.content)
+            elif response.status_code == 401 and not _retried:
+                # Token rejected mid-call despite proactive refresh (server-side
+                # revocation or clock skew); refresh and retry exactly once
+                logger.info("Received 401, refreshing token and retrying the call once...")
+                self._expiry_mono = 0.0
+                if not self.refresh_access_token():
+                    logger.error("Failed to refresh token after 401")
+                    return None
+                return self.make_api_call(endpoint, _retried=True)
             else:
-                logger.error(f"API call failed. Status: {response.status_code}, Response: {response.text}")
+                body_digest = hashlib.sha256(response.content).hexdigest()[:12]
+                logger.error("API call failed. Status: %s, Body sha256: %s", response.status_code, body_digest)
                 return None
                 
         except Exception as e:
-            logger.error(f"Error during API call: {str(e)}")
+            logger.error("Error during API call: %s", e)
             return None
     
+    def iter_api_call(self, endpoint, key="QueryResponse.Invoice.item"):
+        """
+        Stream items from a large API response without buffering it
+
+        Parses the response incrementally with ijson, so a multi-megabyte
+        query result is yielded item by item instead of being held in
+        memory as one list. Requires the optional ijson dependency.
+
+        Args:
+            endpoint (str): API endpoint to call
+            key (str): ijson item path to yield from the response
+
+        Yields:
+            dict: Parsed items from the response
+        """
+        import ijson
+
+        if not self.access_token or not self.realm_id:
+            logger.error("Access token or Realm ID not available")
+            return
+
+        if not self._ensure_fresh_token():
+            return
+
+        logger.info("Streaming API call to %s", endpoint)
+
+        if self._api_base is None:
+            self._api_base = f"{_API_BASE_URL}/{self.realm_id}"
+        api_url = f"{self._api_base}/{endpoint}"
+
+        headers = dict(_API_HEADERS_TEMPLATE, Authorization=f"Bearer {self.access_token}")
+
+        with self._session.get(api_url, headers=headers, stream=True,
+                               timeout=(_CONNECT_TIMEOUT, _READ_TIMEOUT)) as response:
+            if response.status_code != 200:
+                logger.error("API call failed. Status: %s", response.status_code)
+                return
+            # Let urllib3 undo any content-encoding before ijson sees the bytes
+            response.raw.decode_content = True
+            yield from ijson.items(response.raw, key)
+
+    def _get_http2_client(self):
+        """Create the shared HTTP/2 client lazily"""
+        if self._hclient is None:
+            self._hclient = httpx.Client(
+                http2=True,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+                timeout=httpx.Timeout(_READ_TIMEOUT, connect=_CONNECT_TIMEOUT)
+            )
+        return self._hclient
+
+    def make_api_calls(self, endpoints):
+        """
+        Make several API calls, multiplexed over one HTTP/2 connection
+
+        HTTP/2 stream multiplexing lets all the requests share a single
+        TCP+TLS connection, so N small endpoint fetches pay one handshake
+        instead of N. Falls back to serial make_api_call requests when
+        httpx (with its http2 extra) is not installed.
+
+        Args:
+            endpoints (list): API endpoints to call
+
+        Returns:
+            dict: Mapping of endpoint to response data (None for failures)
+        """
+        if not endpoints:
+            return {}
+
+        if not self.access_token or not self.realm_id:
+            logger.error("Access token or Realm ID not available")
+            return {endpoint: None for endpoint in endpoints}
+
+        if not self._ensure_fresh_token():
+            return {endpoint: None for endpoint in endpoints}
+
+        if httpx is None:
+            return {endpoint: self.make_api_call(endpoint) for endpoint in endpoints}
+
+        try:
+            client = self._get_http2_client()
+        except ImportError:
+            # httpx is present but the h2 package is not
+            return {endpoint: self.make_api_call(endpoint) for endpoint in endpoints}
+
+        if self._api_base is None:
+            self._api_base = f"{_API_BASE_URL}/{self.realm_id}"
+        headers = dict(_API_HEADERS_TEMPLATE, Authorization=f"Bearer {self.access_token}")
+
+        def fetch(endpoint):
+            try:
+                response = client.get(f"{self._api_base}/{endpoint}", headers=headers)
+                if response.status_code == 200:
+                    return _json_loads(response.content)
+                logger.error("API call to %s failed. Status: %s", endpoint, response.status_code)
+                return None
+            except Exception as e:
+                logger.error("Error during API call to %s: %s", endpoint, e)
+                return None
+
+        # The client is thread-safe; a small pool issues the requests
+        # concurrently so they actually interleave on the one connection
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(endpoints))) as pool:
+            results = list(pool.map(fetch, endpoints))
+
+        return dict(zip(endpoints, results))
+
     def display_token_info(self):
         """Display token information in a formatted way"""
-        print("\n" + "="*50)
-        print("QUICKBOOKS OAUTH TOKEN INFORMATION")
-        print("="*50)
-        
-        if self.auth_code:
-            print(f"Authorization Code: {self.auth_code}")
-        else:
-            print("Authorization Code: Not obtained")
-            
+        # Build the whole block up front and emit it in one write: one
+        # stdout lock acquisition and syscall instead of ten
+        lines = ["", "="*50, "QUICKBOOKS OAUTH TOKEN INFORMATION", "="*50]
+
+        lines.append(f"Authorization Code: {self.auth_code or 'Not obtained'}")
+
         if self.access_token:
-            print(f"Access Token: {self.access_token}")
-            
-            # Calculate remaining time
-            if self.token_expiry:
-                remaining = max(0, self.token_expiry - int(time.time()))
+            lines.append(f"Access Token: {self.access_token}")
+
+            # Calculate remaining time until the proactive refresh deadline
+            if self._expiry_mono is not None:
+                remaining = max(0, int(self._expiry_mono - time.monotonic()))
                 minutes = remaining // 60
-                print(f"Access Token Expires In: {minutes} minutes")
-        else:
-            print("Access Token: Not obtained")
-            
-        if self.refresh_token:
-            print(f"Refresh Token: {self.refresh_token}")
+                lines.append(f"Access Token Expires In: {minutes} minutes")
         else:
-            print("Refresh Token: Not obtained")
-            
-        if self.realm_id:
-            print(f"Realm ID: {self.realm_id}")
-        else:
-            print("Realm ID: Not obtained")
-            
-        print("="*50 + "\n")
+            lines.append("Access Token: Not obtained")
+
+        lines.append(f"Refresh Token: {self.refresh_token or 'Not obtained'}")
+        lines.append(f"Realm ID: {self.realm_id or 'Not obtained'}")
+        lines.append("="*50 + "\n")
+
+        sys.stdout.write("\n".join(lines) + "\n")
+
+
+class AsyncQuickBooksOAuth:
+    """
+    Asynchronous variant of QuickBooksOAuth built on aiohttp
+
+    API calls are I/O-bound, so running them concurrently drops wall time
+    from the sum of the latencies to the slowest single call. Example:
+
+        async with AsyncQuickBooksOAuth(client_id, client_secret, redirect_uri) as qb:
+            customers, invoices = await asyncio.gather(
+                qb.make_api_call("customers"),
+                qb.make_api_call("invoices")
+            )
+
+    Requires the optional aiohttp dependency. The synchronous
+    QuickBooksOAuth class remains the default for simple serial flows.
+    """
+
+    def __init__(self, client_id, client_secret, redirect_uri):
+        """
+        Initialize async QuickBooks OAuth with required credentials
+
+        Args:
+            client_id (str): QuickBooks application client ID
+            client_secret (str): QuickBooks application client secret
+            redirect_uri (str): Authorized redirect URI
+        """
+        if aiohttp is None:
+            raise ImportError("aiohttp is required for AsyncQuickBooksOAuth (pip install aiohttp)")
+
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.redirect_uri = redirect_uri
+        self.auth_code = None
+        self.access_token = None
+        self.refresh_token = None
+        self.realm_id = None
+        self._expiry_mono = None
+        self._refresh_lock = asyncio.Lock()
+        self._session = None
+        self._session_loop = None
+        self._state = secrets.token_urlsafe(16)
+        self._auth_url = "https://appcenter.intuit.com/connect/oauth2?" + urlencode({
+            "client_id": client_id,
+            "redirect_uri": redirect_uri,
+            "response_type": "code",
+            "scope": "com.intuit.quickbooks.accounting",
+            "state": self._state
+        })
+        self._secrets_filter = SecretsFilter(self)
+        logger.addFilter(self._secrets_filter)
+
+    def _get_session(self):
+        """Create the aiohttp session lazily so it binds to the running loop"""
+        loop = asyncio.get_running_loop()
+
+        if (self._session is not None and not self._session.closed
+                and (self._session_loop is not loop or self._session_loop.is_closed())):
+            # Left over from an earlier loop (e.g. a previous asyncio.run):
+            # an open session bound to a closed loop fails every request
+            # with "Event loop is closed". It can't be awaited closed from
+            # this loop either, so detach it and start fresh.
+            try:
+                self._session.detach()
+            except Exception:
+                pass
+            self._session = None
+
+        if self._session is None or self._session.closed:
+            # Basic auth is passed per token request rather than session-wide;
+            # aiohttp rejects a session auth combined with the Bearer header
+            # that make_api_call sets explicitly
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=64, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(sock_connect=_CONNECT_TIMEOUT, sock_read=_READ_TIMEOUT),
+                headers={"Accept": "application/json"}
+            )
+            self._session_loop = loop
+        return self._session
+
+    async def close(self):
+        """Release the underlying HTTP connection pool"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        logger.removeFilter(self._secrets_filter)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    @property
+    def token_expiry(self):
+        """Wall-clock expiry derived lazily from the monotonic deadline"""
+        if self._expiry_mono is None:
+            return None
+        return int(time.time() + (self._expiry_mono - time.monotonic()))
+
+    async def exchange_code_for_tokens(self):
+        """
+        Exchange authorization code for access and refresh tokens
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if not self.auth_code:
+            logger.error("No authorization code available to exchange for tokens")
+            return False
+
+        logger.info("Exchanging authorization code for tokens...")
+
+        payload = {
+            "grant_type": "authorization_code",
+            "code": self.auth_code,
+            "redirect_uri": self.redirect_uri
+        }
+
+        try:
+            session = self._get_session()
+            auth = aiohttp.BasicAuth(self.client_id, self.client_secret)
+            async with session.post(_TOKEN_URL, data=payload, auth=auth) as response:
+                if response.status == 200:
+                    token_data = await response.json()
+                    self.access_token = token_data.get("access_token")
+                    self.refresh_token = token_data.get("refresh_token")
+                    expires_in = token_data.get("expires_in", 3600)
+                    self._expiry_mono = time.monotonic() + expires_in - _TOKEN_SAFETY_SECONDS
+
+                    logger.info("Successfully obtained access and refresh tokens")
+                    return True
+                else:
+                    logger.error("Failed to exchange code for tokens. Status: %s", response.status)
+                    return False
+
+        except Exception as e:
+            logger.error("Error during token exchange: %s", e)
+            return False
+
+    async def refresh_access_token(self):
+        """
+        Refresh the access token using the refresh token
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if not self.refresh_token:
+            logger.error("No refresh token available")
+            return False
+
+        logger.info("Refreshing access token...")
+
+        payload = {
+            "grant_type": "refresh_token",
+            "refresh_token": self.refresh_token
+        }
+
+        try:
+            session = self._get_session()
+            auth = aiohttp.BasicAuth(self.client_id, self.client_secret)
+            async with session.post(_TOKEN_URL, data=payload, auth=auth) as response:
+                if response.status == 200:
+                    token_data = await response.json()
+                    self.access_token = token_data.get("access_token")
+                    self.refresh_token = token_data.get("refresh_token")
+                    expires_in = token_data.get("expires_in", 3600)
+                    self._expiry_mono = time.monotonic() + expires_in - _TOKEN_SAFETY_SECONDS
+
+                    logger.info("Successfully refreshed access token")
+                    return True
+                else:
+                    logger.error("Failed to refresh access token. Status: %s", response.status)
+                    return False
+
+        except Exception as e:
+            logger.error("Error during token refresh: %s", e)
+            return False
+
+    async def make_api_call(self, endpoint, _retried=False):
+        """
+        Make an API call to QuickBooks API
+
+        Args:
+            endpoint (str): API endpoint to call
+
+        Returns:
+            dict: API response data
+        """
+        if not self.access_token or not self.realm_id:
+            logger.error("Access token or Realm ID not available")
+            return None
+
+        # Single-flight refresh: gathered tasks wait on one refresh rather
+        # than each posting to the token endpoint independently
+        if self._expiry_mono is not None and time.monotonic() >= self._expiry_mono:
+            async with self._refresh_lock:
+                if self._expiry_mono is not None and time.monotonic() >= self._expiry_mono:
+                    logger.info("Access token expired, refreshing...")
+                    if not await self.refresh_access_token():
+                        logger.error("Failed to refresh expired token")
+                        return None
+
+        logger.info("Making API call to %s", endpoint)
+
+        api_url = f"{_API_BASE_URL}/{self.realm_id}/{endpoint}"
+
+        headers = {
+            "Authorization": f"Bearer {self.access_token}",
+            "Content-Type": "application/json"
+        }
+
+        try:
+            session = self._get_session()
+            async with session.get(api_url, headers=headers) as response:
+                if response.status == 200:
+                    logger.info("API call successful")
+                    return await response.json()
+                elif response.status == 401 and not _retried:
+                    logger.info("Received 401, refreshing token and retrying the call once...")
+                    self._expiry_mono = 0.0
+                    if not await self.refresh_access_token():
+                        logger.error("Failed to refresh token after 401")
+                        return None
+                    return await self.make_api_call(endpoint, _retried=True)
+                else:
+                    logger.error("API call failed. Status: %s", response.status)
+                    return None
+
+        except Exception as e:
+            logger.error("Error during API call: %s", e)
+            return None
+
+    # Redirect-URL parsing has no I/O, so reuse the sync implementation
+    set_auth_code_from_redirect = QuickBooksOAuth.set_auth_code_from_redirect
+    get_authorization_url = QuickBooksOAuth.get_authorization_url
+
+    def make_api_call_sync(self, endpoint):
+        """Thin synchronous wrapper for callers not yet running an event loop"""
+        async def _call():
+            # Close the session inside the same loop asyncio.run creates;
+            # a session left open here would bind to the closed loop and
+            # break every subsequent call
+            try:
+                return await self.make_api_call(endpoint)
+            finally:
+                if self._session is not None:
+                    await self._session.close()
+                    self._session = None
+
+        return asyncio.run(_call())
 
 
 def scrape_oauth_playground_docs():
@@ -278,11 +825,30 @@ def scrape_oauth_playground_docs():
         str: Scraped content or None if failed
     """
     url = "https://developer.intuit.com/app/developer/qbo/docs/develop/authentication-and-authorization/oauth-2.0-playground"
+
+    # Serve from the on-disk cache while it is fresh
+    try:
+        if _DOCS_CACHE_PATH.exists() and time.time() - _DOCS_CACHE_PATH.stat().st_mtime < _DOCS_CACHE_TTL_SECONDS:
+            return _DOCS_CACHE_PATH.read_text()
+    except OSError:
+        pass
+
     try:
+        # Imported lazily: trafilatura pulls in lxml and friends (hundreds of
+        # ms of cold start) and only this docs helper needs it
+        import trafilatura
+
         print(f"Scraping OAuth documentation from: {url}")
-        downloaded = trafilatura.fetch_url(url)
+        # Fetch with requests so the download gets the same bounded timeouts
+        # as the rest of the module; trafilatura.fetch_url has none
+        downloaded = requests.get(url, timeout=(_CONNECT_TIMEOUT, _READ_TIMEOUT)).text
         content = trafilatura.extract(downloaded)
         if content:
+            try:
+                _DOCS_CACHE_PATH.write_text(content)
+            except OSError:
+                # Read-only filesystem: fall back to fetching every time
+                pass
             return content
         return None
     except Exception as e:
@@ -292,21 +858,19 @@ def scrape_oauth_playground_docs():
 
 def display_oauth_playground_info():
     """Display information about the OAuth 2.0 Playground"""
-    print("\n" + "="*50)
-    print("OAUTH 2.0 PLAYGROUND OVERVIEW")
-    print("="*50)
-    
+    lines = ["", "="*50, "OAUTH 2.0 PLAYGROUND OVERVIEW", "="*50]
+
     # Try to get the documentation via web scraping
     content = scrape_oauth_playground_docs()
-    
+
     if content:
-        print("\nSuccessfully scraped OAuth Playground documentation:")
-        print("-" * 40)
+        lines.append("\nSuccessfully scraped OAuth Playground documentation:")
+        lines.append("-" * 40)
         # Display a preview (first 500 characters)
-        print(content[:500] + "...\n")
+        lines.append(content[:500] + "...\n")
     else:
         # Fallback to static information
-        print("""
+        lines.append("""
 The OAuth 2.0 Playground is a tool that helps you understand and test the
 QuickBooks OAuth 2.0 authorization flow. It consists of the following steps:
 
@@ -323,9 +887,11 @@ Use the access token to make API calls to QuickBooks.
 Step 4: Refresh access token
 When the access token expires, use the refresh token to get a new one.
 """)
-    
-    print("Full documentation available at: https://developer.intuit.com/app/developer/qbo/docs/develop/authentication-and-authorization/oauth-2.0-playground")
-    print("="*50)
+
+    lines.append("Full documentation available at: https://developer.intuit.com/app/developer/qbo/docs/develop/authentication-and-authorization/oauth-2.0-playground")
+    lines.append("="*50)
+
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def demonstrate_oauth_flow():
@@ -350,7 +916,7 @@ def demonstrate_oauth_flow():
     print("After the user authorizes your application, they're redirected back to your")
     print("redirect URI with an authorization code and realm ID (if they selected a company).")
     print("\nExample redirect URL:")
-    sample_redirect = f"{redirect_uri}?code=AB123456789&realmId=1234567890&state=randomstate"
+    sample_redirect = f"{redirect_uri}?code=AB123456789&realmId=1234567890&state={qb_oauth._state}"
     print(sample_redirect)
     
     # Process the redirect URL to extract the authorization code and realm ID
@@ -381,13 +947,20 @@ def demonstrate_oauth_flow():
 
 def main():
     """Main function to run the QuickBooks OAuth demonstration"""
-    print("\n" + "="*50)
-    print("QUICKBOOKS OAUTH 2.0 AUTOMATION")
-    print("="*50)
-    
-    print("\nThis is a complete implementation of the QuickBooks OAuth 2.0 flow.")
-    print("It demonstrates the entire process from authorization to API calls")
-    print("without hardcoding any authorization codes, tokens, or secrets.")
+    # Configure logging here rather than at import time so importing this
+    # module doesn't mutate global logging state for the host application
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    sys.stdout.write("\n".join([
+        "", "="*50, "QUICKBOOKS OAUTH 2.0 AUTOMATION", "="*50,
+        "",
+        "This is a complete implementation of the QuickBooks OAuth 2.0 flow.",
+        "It demonstrates the entire process from authorization to API calls",
+        "without hardcoding any authorization codes, tokens, or secrets."
+    ]) + "\n")
     
     # Display information about the OAuth 2.0 Playground
     display_oauth_playground_info()
@@ -0,0 +1,49 @@
+import asyncio
+import unittest
+
+try:
+    import quickbooks_oauth_final
+except ImportError:
+    quickbooks_oauth_final = None
+
+needs_async_client = unittest.skipIf(
+    quickbooks_oauth_final is None or quickbooks_oauth_final.aiohttp is None,
+    "requires the module's runtime dependencies and aiohttp"
+)
+
+
+@needs_async_client
+class AsyncSessionAcrossLoopsTest(unittest.TestCase):
+    """
+    Regression test: a coroutine driven by one asyncio.run (e.g. the token
+    exchange) must not leave behind a session that poisons calls made in a
+    later loop, such as a following make_api_call_sync invocation.
+    """
+
+    def test_session_is_recreated_for_each_new_loop(self):
+        qb = quickbooks_oauth_final.AsyncQuickBooksOAuth(
+            "client-id", "client-secret", "https://example.com/callback"
+        )
+
+        async def get_session():
+            return qb._get_session()
+
+        # Simulates exchange_code_for_tokens creating the session inside
+        # its own asyncio.run loop and leaving it open
+        first = asyncio.run(get_session())
+        self.assertFalse(first.closed)
+
+        async def get_session_and_close():
+            session = qb._get_session()
+            await qb.close()
+            return session
+
+        # A later call runs in a fresh loop and must get a session bound
+        # to that loop, not the stale one from the closed first loop
+        second = asyncio.run(get_session_and_close())
+        self.assertIsNot(second, first)
+        self.assertTrue(second.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()